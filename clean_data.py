@@ -6,15 +6,41 @@ This script performs:
 1. Cleaning macroeconomic data (FRED)
 2. Cleaning equity panel data (Yahoo Finance)
 3. Merging macro + equity data into one final dataset
+4. Converting daily prices into a return panel
+
+Every stage runs the declarative rules in utils/validation.py first;
+rows / cells that fail are written to data/processed/quarantine_*.csv
+with the failed rule names and the action taken (removed or flagged).
 
 Outputs saved to:
     data/processed/macro_clean.csv
     data/processed/equity_clean.csv
     data/processed/merged_panel.csv
+    data/processed/returns_clean.csv
+    data/processed/quarantine_{macro,equity,prices,returns}.csv
 """
 
 import pandas as pd
 from utils.helpers import get_data_dir
+from utils.validation import (
+    EQUITY_RULES,
+    MACRO_RULES,
+    PRICE_RULES,
+    RETURN_RULES,
+    validate_panel,
+    validate_rows,
+)
+
+
+# ----------------------------------------------------
+# Utility: save quarantined rows / cells
+# ----------------------------------------------------
+def save_quarantine(quarantine_df, name):
+    data_dir = get_data_dir()
+    out_path = data_dir / "processed" / f"quarantine_{name}.csv"
+
+    quarantine_df.to_csv(out_path, index=False)
+    print(f"[Quarantine] {len(quarantine_df)} {name} records → {out_path}")
 
 
 # ----------------------------------------------------
@@ -39,8 +65,12 @@ def clean_macro_data():
         macro_df["date"] = pd.to_datetime(macro_df["date"])
         macro_df.set_index("date", inplace=True)
 
+    # Data-quality rules (ranges, monotonic dates)
+    macro_df, quarantine = validate_panel(macro_df, MACRO_RULES)
+    save_quarantine(quarantine, "macro")
+
     # Resample monthly (if daily) and forward fill
-    macro_df = macro_df.resample("M").last().ffill()
+    macro_df = macro_df.resample("ME").last().ffill()
 
     macro_df.to_csv(out_path)
     print(f"[Saved] Clean macro data → {out_path}")
@@ -78,8 +108,11 @@ def clean_equity_data():
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    # Remove rows with missing drawdown (cannot analyze)
-    df = df[df["q2_max_drawdown"].notna()]
+    # Data-quality rules: rows with missing drawdown (cannot analyze),
+    # missing fundamentals, out-of-range values or a broken balance-sheet
+    # identity are quarantined instead of becoming NaN ratios
+    df, quarantine = validate_rows(df, EQUITY_RULES)
+    save_quarantine(quarantine, "equity")
 
     df.to_csv(out_path, index=False)
     print(f"[Saved] Clean equity data → {out_path}")
@@ -119,6 +152,48 @@ def merge_macro_equity():
     print(f"[Saved] Final merged panel → {out_path}")
 
 
+# ----------------------------------------------------
+# 4. Daily Return Panel
+# ----------------------------------------------------
+def clean_price_data():
+    """
+    Convert raw daily closes (date × symbol) into simple returns.
+    Non-positive prices, extreme jumps and jumps on Yahoo-reported split
+    dates are quarantined and treated as missing; split-like jumps on
+    symbols without split data are only flagged. Gaps are not filled, so
+    downstream statistics use pairwise-complete observations.
+    """
+    data_dir = get_data_dir()
+
+    raw_path = data_dir / "raw" / "prices_raw.csv"
+    out_path = data_dir / "processed" / "returns_clean.csv"
+
+    if not raw_path.exists():
+        print(f"[Skip] No daily prices found at {raw_path}")
+        return
+
+    print("\n[Step] Building daily return panel...")
+
+    prices = pd.read_csv(raw_path, index_col="date", parse_dates=["date"])
+    prices = prices.apply(pd.to_numeric, errors="coerce")
+    prices, quarantine = validate_panel(prices, PRICE_RULES)
+    save_quarantine(quarantine, "prices")
+
+    # Yahoo-reported splits (if downloaded) decide split artifacts
+    splits_path = data_dir / "raw" / "splits_raw.csv"
+    splits = None
+    if splits_path.exists():
+        splits = pd.read_csv(splits_path, index_col="date", parse_dates=["date"])
+
+    returns = prices.pct_change(fill_method=None).iloc[1:]
+    returns, quarantine = validate_panel(returns, RETURN_RULES, events=splits)
+    save_quarantine(quarantine, "returns")
+    returns = returns.astype("float32")
+
+    returns.to_csv(out_path, index_label="date")
+    print(f"[Saved] Daily returns → {out_path}")
+
+
 # ----------------------------------------------------
 # Main Execution
 # ----------------------------------------------------
@@ -128,6 +203,7 @@ def main():
     clean_macro_data()
     clean_equity_data()
     merge_macro_equity()
+    clean_price_data()
 
     print("\n=== Data Cleaning Complete ===\n")
 
@@ -0,0 +1,80 @@
+"""
+generate_synthetic_data.py
+Offline load testing: synthetic raw data + fake FRED server
+
+This script:
+1. Writes synthetic raw files in the get_data.py schema
+   (macro_raw.csv, equity_raw.csv, prices_raw.csv, splits_raw.csv)
+   at a chosen scale
+2. Optionally serves the synthetic FRED series on a local fake
+   observations endpoint, so get_data.py's FRED step runs offline
+
+Raw data are saved into:
+    data/raw/   (or --out)
+
+Example (100× today's universe, 25 years, 4 crashes):
+    python generate_synthetic_data.py --tickers 500 --years 25 --crashes 4
+    python clean_data.py && python run_analysis.py && python visualize_results.py
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from utils.fake_fred import FakeFREDServer
+from utils.helpers import get_data_dir
+from utils.synthetic import generate_raw_data
+
+
+# ------------------------------
+# Main Execution
+# ------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic raw data.")
+    parser.add_argument("--tickers", type=int, default=500, help="Number of symbols")
+    parser.add_argument("--years", type=int, default=25, help="Years of daily history")
+    parser.add_argument("--missing-rate", type=float, default=0.01,
+                        help="Share of missing price cells / fundamentals")
+    parser.add_argument("--crashes", type=int, default=3, help="Number of crash episodes")
+    parser.add_argument("--late-listing-rate", type=float, default=0.1,
+                        help="Share of symbols that list partway through")
+    parser.add_argument("--bad-data-rate", type=float, default=0.0,
+                        help="Share of symbols with zero prices / unadjusted splits")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Output directory (default: data/raw)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Serve the FRED series on a local fake endpoint")
+    parser.add_argument("--port", type=int, default=8765, help="Fake FRED port")
+    args = parser.parse_args()
+
+    raw_dir = Path(args.out) if args.out else get_data_dir() / "raw"
+    raw_dir.mkdir(parents=True, exist_ok=True)
+
+    print("\n=== Generating Synthetic Data ===\n")
+    started = time.perf_counter()
+
+    series = generate_raw_data(
+        raw_dir,
+        n_tickers=args.tickers,
+        years=args.years,
+        missing_rate=args.missing_rate,
+        n_crashes=args.crashes,
+        late_listing_rate=args.late_listing_rate,
+        bad_data_rate=args.bad_data_rate,
+        seed=args.seed,
+    )
+
+    print(f"\n=== Synthetic Data Complete ({time.perf_counter() - started:.1f}s) ===\n")
+
+    if args.serve:
+        server = FakeFREDServer(series, port=args.port).start()
+        print(f"Set FRED_API_URL={server.url} to use it. Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,19 +5,33 @@ Step 1: Collect Raw Data (FRED + Yahoo Finance)
 This script downloads:
 1. Macroeconomic indicators from FRED
 2. Stock price + fundamentals + drawdown metrics from Yahoo Finance
+3. Daily price history from Yahoo Finance
 
 Raw data are saved into:
     data/raw/macro_raw.csv
     data/raw/equity_raw.csv
+    data/raw/prices_raw.csv
+    data/raw/splits_raw.csv
+
+With --jobs <spec.json>, the multi-universe / multi-window scheduler
+(utils/scheduler.py) runs instead and writes into data/raw/jobs/.
 """
 
+import argparse
 import pandas as pd
 from pathlib import Path
 
 # Local utility imports
-from utils.fred_api import FREDClient
-from utils.yahoo_api import build_equity_panel
+from utils.fred_api import FREDClient, FRED_SERIES
+from utils.yahoo_api import build_equity_panel, fetch_price_history
 from utils.helpers import get_data_dir
+from utils.scheduler import load_job_spec, run_jobs
+
+
+# TODO: Replace with your full NASDAQ list
+SYMBOLS = [
+    "AAPL", "MSFT", "GOOGL", "AMZN", "META"
+]
 
 
 # ------------------------------
@@ -31,22 +45,12 @@ def download_macro_data():
     raw_dir = data_dir / "raw"
     raw_dir.mkdir(parents=True, exist_ok=True)
 
-    fred_series = [
-        "GDP",
-        "CPIAUCSL",
-        "UNRATE",
-        "DGS3MO",
-        "DGS10",
-        "RSAFS",
-        "HOUST"
-    ]
-
     print("\n[Step] Downloading FRED macroeconomic series...")
     client = FREDClient()
 
     macro_df = client.fetch_series(
-        series_ids=fred_series,
-        start_date="2000-01-01",
+        series_ids=FRED_SERIES,
+        start_date="1998-01-01",
         end_date="2025-12-31"
     )
 
@@ -67,14 +71,9 @@ def download_equity_data():
     raw_dir = data_dir / "raw"
     raw_dir.mkdir(parents=True, exist_ok=True)
 
-    # TODO: Replace with your full NASDAQ list
-    symbols = [
-        "AAPL", "MSFT", "GOOGL", "AMZN", "META"
-    ]
-
     print("\n[Step] Downloading Yahoo Finance equity panel...")
     panel_df = build_equity_panel(
-        symbols=symbols,
+        symbols=SYMBOLS,
         price_start="2025-04-01",
         price_end="2025-06-30"
     )
@@ -84,13 +83,68 @@ def download_equity_data():
     print(f"[Saved] Equity panel → {out_path}")
 
 
+# ----------------------------------------
+# 3. Download Daily Price History (Yahoo Finance)
+# ----------------------------------------
+def download_price_history():
+    """
+    Download daily closes since 1998 for the return panel
+    (correlation analysis + walk-forward backtest).
+    """
+    data_dir = get_data_dir()
+    raw_dir = data_dir / "raw"
+    raw_dir.mkdir(parents=True, exist_ok=True)
+
+    print("\n[Step] Downloading Yahoo Finance price history...")
+    prices_df, splits_df = fetch_price_history(
+        symbols=SYMBOLS,
+        start="1998-01-01",
+        end="2025-12-31"
+    )
+
+    out_path = raw_dir / "prices_raw.csv"
+    prices_df.to_csv(out_path, index_label="date")
+    print(f"[Saved] Daily prices → {out_path}")
+
+    # Reported splits let clean_data tell unadjusted splits from real moves
+    splits_path = raw_dir / "splits_raw.csv"
+    splits_df.to_csv(splits_path, index_label="date")
+    print(f"[Saved] Stock splits → {splits_path}")
+
+
+# ----------------------------------------
+# 4. Scheduled Jobs (many universes × windows)
+# ----------------------------------------
+def download_jobs(spec_path, max_workers=8, use_processes=False):
+    """
+    Expand a job spec into (symbol, window) tasks and run them.
+    """
+    data_dir = get_data_dir()
+    out_dir = data_dir / "raw" / "jobs"
+
+    print(f"\n[Step] Running scheduled jobs from {spec_path}...")
+    jobs = load_job_spec(spec_path)
+    run_jobs(jobs, out_dir, max_workers=max_workers, use_processes=use_processes)
+
+
 # ------------------------------
 # Main Execution
 # ------------------------------
 def main():
+    parser = argparse.ArgumentParser(description="Collect raw FRED + Yahoo data.")
+    parser.add_argument("--jobs", help="Job spec JSON (multi-universe scheduler)")
+    parser.add_argument("--workers", type=int, default=8, help="Pool size for --jobs")
+    parser.add_argument("--processes", action="store_true",
+                        help="Use a process pool instead of threads for --jobs")
+    args = parser.parse_args()
+
     print("\n=== Starting Data Collection ===\n")
-    download_macro_data()
-    download_equity_data()
+    if args.jobs:
+        download_jobs(args.jobs, max_workers=args.workers, use_processes=args.processes)
+    else:
+        download_macro_data()
+        download_equity_data()
+        download_price_history()
     print("\n=== Data Collection Complete ===\n")
 
 
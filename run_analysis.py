@@ -8,6 +8,8 @@ This script:
 3. Creates a binary tail-risk label
 4. Fits a logistic regression model
 5. Saves analysis summary to results/analysis_summary.txt
+6. Runs a walk-forward backtest (train on prior quarters, score the
+   next one) and splits precision/recall by FRED macro regime
 """
 
 import pandas as pd
@@ -15,6 +17,12 @@ from pathlib import Path
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
 from utils.helpers import get_data_dir
+from utils.backtest import (
+    build_feature_panel,
+    macro_regimes,
+    walk_forward_backtest,
+    summarize_by_regime,
+)
 
 
 # ----------------------------------------------------
@@ -108,12 +116,70 @@ def run_analysis():
     write_results(text)
 
 
+# ----------------------------------------------------
+# Walk-forward backtest
+# ----------------------------------------------------
+def run_backtest(start="2000Q1"):
+    """
+    Quarterly walk-forward backtest of the tail-risk classifier,
+    with results by quarter and by macro regime.
+    """
+    data_dir = get_data_dir()
+    returns_path = data_dir / "processed" / "returns_clean.csv"
+    macro_path = data_dir / "processed" / "macro_clean.csv"
+
+    if not returns_path.exists():
+        print(f"[Skip] No return panel at {returns_path}")
+        return
+
+    print("\n[Step] Running walk-forward backtest...")
+
+    returns_df = pd.read_csv(returns_path)
+    macro_df = pd.read_csv(macro_path)
+
+    panel = build_feature_panel(returns_df, macro_df)
+    results = walk_forward_backtest(panel, start=start)
+
+    if results.empty:
+        print("[Warning] Not enough history for a walk-forward backtest")
+        return
+
+    regimes = macro_regimes(macro_df)
+    by_regime = summarize_by_regime(results, regimes)
+
+    results_dir = Path("results")
+    results_dir.mkdir(exist_ok=True)
+    results.to_csv(results_dir / "backtest_by_quarter.csv", index=False)
+
+    total = results[["tp", "fp", "fn"]].sum()
+    precision = total["tp"] / max(total["tp"] + total["fp"], 1)
+    recall = total["tp"] / max(total["tp"] + total["fn"], 1)
+
+    text = "=== Walk-Forward Backtest Summary ===\n\n"
+    text += "Test quarters: {} ({} → {})\n".format(
+        len(results), results["quarter"].iloc[0], results["quarter"].iloc[-1]
+    )
+    text += "Pooled precision: {:.3f}\n".format(precision)
+    text += "Pooled recall: {:.3f}\n\n".format(recall)
+
+    text += "=== By Macro Regime ===\n"
+    text += by_regime.to_string()
+    text += "\n\n"
+
+    text += "=== By Quarter ===\n"
+    text += results.to_string(index=False)
+    text += "\n"
+
+    write_results(text, filename="backtest_summary.txt")
+
+
 # ----------------------------------------------------
 # Main execution
 # ----------------------------------------------------
 def main():
     print("\n=== Starting Statistical Analysis ===\n")
     run_analysis()
+    run_backtest()
     print("\n=== Analysis Complete ===\n")
 
 
@@ -0,0 +1,286 @@
+"""
+backtest.py
+Walk-forward backtest of the tail-risk classifier:
+- quarterly (symbol, quarter) feature panel built once from daily returns
+- expanding-window train / next-quarter test folds, run in parallel
+- precision / recall per quarter and by FRED macro regime
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+
+# Price features are from the *previous* quarter and macro values are
+# those published by the previous quarter end (see RELEASE_LAG_MONTHS).
+# FRED returns the latest revised vintage, not the first release, so
+# GDP in particular still carries some revision look-ahead.
+# Fundamentals are left out by default: Yahoo only returns the latest
+# balance sheet, which would look ahead for every historical quarter.
+DEFAULT_FEATURES = [
+    "prev_return",
+    "prev_max_drawdown",
+    "prev_volatility",
+    "GDP",
+    "CPIAUCSL",
+    "UNRATE",
+    "term_spread",
+]
+
+# Months between the end of an observation's month in macro_clean and
+# its publication: monthly series come out during the next month, and
+# GDP (dated at quarter start, e.g. Q1 = 01-01) about a month after the
+# quarter ends. Daily Treasury yields are known the same day.
+RELEASE_LAG_MONTHS = {
+    "GDP": 3,
+    "CPIAUCSL": 1,
+    "UNRATE": 1,
+    "RSAFS": 1,
+    "HOUST": 1,
+}
+
+
+# ----------------------------------------------------
+# 1. Quarterly feature panel (built once, shared by all folds)
+# ----------------------------------------------------
+def _quarterly_price_stats(returns_df):
+    """
+    Per (quarter, symbol): return, max drawdown and daily volatility.
+    """
+    returns = returns_df.copy()
+    if "date" in returns.columns:
+        returns = returns.set_index("date")
+    returns.index = pd.to_datetime(returns.index)
+    returns = returns.sort_index().astype("float64")
+
+    quarter = returns.index.to_period("Q")
+    growth = 1.0 + returns.fillna(0.0)
+
+    # Wealth restarts at 1 each quarter; drawdown vs the in-quarter peak
+    wealth = growth.groupby(quarter).cumprod()
+    peak = wealth.groupby(quarter).cummax()
+    drawdown = (wealth / peak - 1.0).where(returns.notna())
+
+    observed = returns.notna().groupby(quarter).sum()
+    stats = {
+        "q_return": (wealth.groupby(quarter).last() - 1.0).where(observed > 0),
+        "q_max_drawdown": drawdown.groupby(quarter).min(),
+        "q_volatility": returns.groupby(quarter).std(),
+    }
+
+    long = pd.concat(
+        {name: frame.stack() for name, frame in stats.items()}, axis=1
+    )
+    long.index.names = ["quarter", "symbol"]
+    return long
+
+
+def _published_monthly(macro_df):
+    """
+    Month-end macro values as they were published by each month end:
+    each series is shifted by its RELEASE_LAG_MONTHS.
+    """
+    macro = macro_df.copy()
+    if "date" in macro.columns:
+        macro = macro.set_index("date")
+    macro.index = pd.to_datetime(macro.index)
+    macro = macro.apply(pd.to_numeric, errors="coerce").sort_index()
+
+    monthly = macro.resample("ME").last().ffill()
+    for col, lag in RELEASE_LAG_MONTHS.items():
+        if col in monthly.columns:
+            monthly[col] = monthly[col].shift(lag)
+    return monthly
+
+
+def _quarterly_macro(macro_df):
+    """
+    Macro values published by the end of the previous quarter, keyed by
+    quarter.
+    """
+    macro = _published_monthly(macro_df)
+
+    if "DGS10" in macro.columns and "DGS3MO" in macro.columns:
+        macro["term_spread"] = macro["DGS10"] - macro["DGS3MO"]
+
+    quarterly = macro.resample("QE").last()
+    quarterly.index = quarterly.index.to_period("Q") + 1
+    quarterly.index.name = "quarter"
+    return quarterly
+
+
+def build_feature_panel(returns_df, macro_df, equity_df=None, tail_quantile=0.25):
+    """
+    Build the (quarter, symbol) panel with lagged features and the label.
+
+    tail_risk = 1 if the quarter's max drawdown is in the bottom
+    `tail_quantile` of that quarter's cross-section (same rule as
+    run_analysis, applied per quarter).
+    """
+    stats = _quarterly_price_stats(returns_df)
+
+    lagged = stats.groupby(level="symbol").shift(1)
+    panel = pd.DataFrame({
+        "q_max_drawdown": stats["q_max_drawdown"],
+        "prev_return": lagged["q_return"],
+        "prev_max_drawdown": lagged["q_max_drawdown"],
+        "prev_volatility": lagged["q_volatility"],
+    }).reset_index()
+
+    cutoff = panel.groupby("quarter")["q_max_drawdown"].transform(
+        lambda s: s.quantile(tail_quantile)
+    )
+    panel["tail_risk"] = (panel["q_max_drawdown"] <= cutoff).astype(int)
+
+    panel = panel.merge(_quarterly_macro(macro_df), left_on="quarter",
+                        right_index=True, how="left")
+
+    if equity_df is not None:
+        fundamentals = ["symbol", "roa", "net_profit_margin", "debt_to_assets"]
+        cols = [c for c in fundamentals if c in equity_df.columns]
+        panel = panel.merge(equity_df[cols], on="symbol", how="left")
+
+    return panel.sort_values(["quarter", "symbol"]).reset_index(drop=True)
+
+
+# ----------------------------------------------------
+# 2. FRED macro regimes
+# ----------------------------------------------------
+def macro_regimes(macro_df, trend_months=6):
+    """
+    Label each quarter by data published before it starts (release
+    lags applied, latest FRED vintage):
+    - unrate_trend: "rising" / "falling" (UNRATE vs `trend_months` earlier)
+    - yield_curve: "inverted" / "normal" (DGS10 - DGS3MO < 0)
+    """
+    monthly = _published_monthly(macro_df)
+
+    regimes = pd.DataFrame(index=monthly.index)
+    if "UNRATE" in monthly.columns:
+        change = monthly["UNRATE"].diff(trend_months)
+        regimes["unrate_trend"] = np.where(
+            change.isna(), None, np.where(change > 0, "rising", "falling")
+        )
+    if "DGS10" in monthly.columns and "DGS3MO" in monthly.columns:
+        spread = monthly["DGS10"] - monthly["DGS3MO"]
+        regimes["yield_curve"] = np.where(
+            spread.isna(), None, np.where(spread < 0, "inverted", "normal")
+        )
+
+    quarterly = regimes.resample("QE").last()
+    quarterly.index = quarterly.index.to_period("Q") + 1
+    quarterly.index.name = "quarter"
+    return quarterly
+
+
+# ----------------------------------------------------
+# 3. Walk-forward folds
+# ----------------------------------------------------
+# Feature arrays are sent to each worker once (pool initializer) and
+# every fold only slices them by quarter code.
+_SHARED = {}
+
+
+def _init_worker(X, y, codes):
+    _SHARED["X"] = X
+    _SHARED["y"] = y
+    _SHARED["codes"] = codes
+
+
+def _run_fold(test_code):
+    X, y, codes = _SHARED["X"], _SHARED["y"], _SHARED["codes"]
+
+    train = codes < test_code
+    test = codes == test_code
+
+    y_train, y_test = y[train], y[test]
+    result = {
+        "n_train": int(train.sum()),
+        "n_test": int(test.sum()),
+        "n_positive": int(y_test.sum()),
+        "tp": 0, "fp": 0, "fn": 0,
+    }
+
+    if result["n_test"] == 0 or len(np.unique(y_train)) < 2:
+        return test_code, result
+
+    model = make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+    model.fit(X[train], y_train)
+    preds = model.predict(X[test])
+
+    result["tp"] = int(((preds == 1) & (y_test == 1)).sum())
+    result["fp"] = int(((preds == 1) & (y_test == 0)).sum())
+    result["fn"] = int(((preds == 0) & (y_test == 1)).sum())
+    return test_code, result
+
+
+def _precision_recall(df):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["precision"] = df["tp"] / (df["tp"] + df["fp"])
+        df["recall"] = df["tp"] / (df["tp"] + df["fn"])
+    return df
+
+
+def walk_forward_backtest(panel, feature_cols=None, start="2000Q1",
+                          min_train_quarters=4, n_jobs=None):
+    """
+    For each quarter from `start`, train on all earlier quarters and
+    score that quarter's universe. Folds run on a process pool.
+    Output: DataFrame (one row per test quarter).
+    """
+    feature_cols = feature_cols or DEFAULT_FEATURES
+
+    data = panel.dropna(subset=feature_cols + ["q_max_drawdown"])
+    quarters = pd.PeriodIndex(data["quarter"], freq="Q")
+
+    all_quarters = quarters.unique().sort_values()
+    codes = all_quarters.get_indexer(quarters)
+
+    X = data[feature_cols].to_numpy(dtype=np.float64)
+    y = data["tail_risk"].to_numpy(dtype=np.int8)
+
+    first = pd.Period(start, freq="Q")
+    test_codes = [
+        i for i, q in enumerate(all_quarters)
+        if q >= first and i >= min_train_quarters
+    ]
+    if not test_codes:
+        return pd.DataFrame()
+
+    workers = n_jobs or min(len(test_codes), os.cpu_count() or 1)
+    if workers <= 1:
+        _init_worker(X, y, codes)
+        results = [_run_fold(code) for code in test_codes]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(X, y, codes)) as pool:
+            results = list(pool.map(_run_fold, test_codes))
+
+    rows = [{"quarter": all_quarters[code], **res} for code, res in results]
+    return _precision_recall(pd.DataFrame(rows))
+
+
+def summarize_by_regime(results, regimes):
+    """
+    Pool tp / fp / fn within each regime and recompute precision / recall.
+    Output: DataFrame indexed by (regime_type, regime).
+    """
+    merged = results.merge(regimes, left_on="quarter", right_index=True, how="left")
+
+    tables = []
+    for col in regimes.columns:
+        table = merged.groupby(col)[["n_test", "tp", "fp", "fn"]].sum()
+        table["quarters"] = merged.groupby(col).size()
+        table.index = pd.MultiIndex.from_product([[col], table.index],
+                                                 names=["regime_type", "regime"])
+        tables.append(table)
+
+    if not tables:
+        return pd.DataFrame()
+
+    return _precision_recall(pd.concat(tables))
@@ -0,0 +1,341 @@
+"""
+correlation.py
+Blocked, multi-threaded co-movement matrices for large return panels:
+- pairwise Pearson correlation (pairwise NaN handling)
+- lower-tail exceedance correlation
+- empirical lower-tail dependence
+- co-drawdown frequency
+- clustering order + top-k pair extraction
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.fred_api import FRED_SERIES, RATE_SERIES, STRESS_UP_SERIES
+
+
+DEFAULT_BLOCK_SIZE = 512
+
+
+# ----------------------------------------------------
+# Panel preparation
+# ----------------------------------------------------
+def _to_date_index(df):
+    out = df.copy()
+    if "date" in out.columns:
+        out = out.set_index("date")
+    out.index = pd.to_datetime(out.index)
+    return out.sort_index()
+
+
+def build_return_panel(returns_df, macro_df=None, macro_series=None, freq="QE"):
+    """
+    Equity return panel, optionally joined with FRED series changes.
+
+    Without macro_df the daily panel is returned as stored. With
+    macro_df, equity returns are compounded to `freq` periods and joined
+    with each FRED series' change over the same periods: differences
+    for rates (already in percent), percent changes for levels. Only
+    FRED series ids are taken from macro_df, so CSV index columns are
+    never treated as data.
+    """
+    equity = _to_date_index(returns_df).apply(pd.to_numeric, errors="coerce")
+
+    if macro_df is None or macro_df.empty:
+        return equity.astype(np.float32)
+
+    compounded = (1.0 + equity).resample(freq).prod(min_count=1) - 1.0
+
+    macro = _to_date_index(macro_df)
+    series_ids = [s for s in (macro_series or FRED_SERIES) if s in macro.columns]
+    levels = macro[series_ids].apply(pd.to_numeric, errors="coerce")
+    levels = levels.resample(freq).last()
+
+    changes = {}
+    for series in series_ids:
+        if series in RATE_SERIES:
+            changes[series] = levels[series].diff()
+        else:
+            changes[series] = levels[series].pct_change(fill_method=None)
+
+    panel = compounded.join(pd.DataFrame(changes), how="outer")
+    return panel.sort_index().astype(np.float32)
+
+
+def stress_oriented(panel):
+    """
+    Negate FRED series whose stress side is a rise (STRESS_UP_SERIES), so
+    the lower tail of every column is its stress side. Use before the
+    lower-tail metrics on a panel from build_return_panel.
+    """
+    out = panel.copy()
+    cols = [c for c in out.columns if c in STRESS_UP_SERIES]
+    out[cols] = -out[cols]
+    return out
+
+
+def _as_float32(panel):
+    """
+    Return (values, labels) with values as a C-contiguous float32 array.
+    """
+    if isinstance(panel, pd.DataFrame):
+        labels = [str(c) for c in panel.columns]
+        values = panel.to_numpy(dtype=np.float32)
+    else:
+        values = np.asarray(panel, dtype=np.float32)
+        labels = [str(i) for i in range(values.shape[1])]
+
+    values = np.where(np.isfinite(values), values, np.nan).astype(np.float32)
+    return np.ascontiguousarray(values), labels
+
+
+# ----------------------------------------------------
+# Blocked kernel
+# ----------------------------------------------------
+def _column_blocks(n_cols, block_size):
+    return [(start, min(start + block_size, n_cols))
+            for start in range(0, n_cols, block_size)]
+
+
+def _run_blocks(n_cols, block_size, n_jobs, fn):
+    """
+    Call fn(((a0, a1), (b0, b1))) for every upper-triangle pair of
+    column blocks, serially or on a thread pool. Blocks are disjoint, so
+    threads never write the same output cells.
+    """
+    blocks = _column_blocks(n_cols, block_size)
+    tasks = [(bi, bj) for i, bi in enumerate(blocks) for bj in blocks[i:]]
+
+    workers = n_jobs or min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1:
+        for task in tasks:
+            fn(task)
+    else:
+        # numpy matmul releases the GIL, so threads scale across cores
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(fn, tasks))
+
+
+def _masked_corr(values, mask, min_periods=20, block_size=DEFAULT_BLOCK_SIZE, n_jobs=None):
+    """
+    Pearson correlation where pair (i, j) uses rows with mask[:, i] & mask[:, j].
+
+    All pairwise sums are obtained from six float32 matrix products per
+    block, so no pair is ever looped over in Python. Columns are
+    centred before the products to keep float32 cancellation small.
+    Returns (corr, counts).
+    """
+    n_cols = values.shape[1]
+    m = mask.astype(np.float32)
+
+    col_mean = np.nanmean(np.where(mask, values, np.nan), axis=0)
+    col_mean = np.nan_to_num(col_mean).astype(np.float32)
+    z = np.where(mask, values - col_mean, 0.0).astype(np.float32)
+    z2 = z * z
+
+    corr = np.full((n_cols, n_cols), np.nan, dtype=np.float32)
+    counts = np.zeros((n_cols, n_cols), dtype=np.float32)
+
+    def run(task):
+        (a0, a1), (b0, b1) = task
+        ma, mb = m[:, a0:a1], m[:, b0:b1]
+        za, zb = z[:, a0:a1], z[:, b0:b1]
+
+        n = ma.T @ mb
+        sx = za.T @ mb
+        sy = ma.T @ zb
+        sxx = z2[:, a0:a1].T @ mb
+        syy = ma.T @ z2[:, b0:b1]
+        sxy = za.T @ zb
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = n * sxy - sx * sy
+            var_x = n * sxx - sx * sx
+            var_y = n * syy - sy * sy
+            r = cov / np.sqrt(var_x * var_y)
+
+        r[(n < min_periods) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        np.clip(r, -1.0, 1.0, out=r)
+
+        corr[a0:a1, b0:b1] = r
+        corr[b0:b1, a0:a1] = r.T
+        counts[a0:a1, b0:b1] = n
+        counts[b0:b1, a0:a1] = n.T
+
+    _run_blocks(n_cols, block_size, n_jobs, run)
+    return corr, counts
+
+
+def _indicator_overlap(indicator, valid, block_size=DEFAULT_BLOCK_SIZE, n_jobs=None):
+    """
+    Blocked co-occurrence counts over jointly valid rows:
+    (joint hits, jointly valid rows, marginal hits), where
+    marginal[i, j] counts rows with a hit in i and a valid j.
+    """
+    n_cols = indicator.shape[1]
+    hits = indicator.astype(np.float32)
+    obs = valid.astype(np.float32)
+
+    joint = np.zeros((n_cols, n_cols), dtype=np.float32)
+    both = np.zeros((n_cols, n_cols), dtype=np.float32)
+    marginal = np.zeros((n_cols, n_cols), dtype=np.float32)
+
+    def run(task):
+        (a0, a1), (b0, b1) = task
+        j = hits[:, a0:a1].T @ hits[:, b0:b1]
+        b = obs[:, a0:a1].T @ obs[:, b0:b1]
+        joint[a0:a1, b0:b1] = j
+        joint[b0:b1, a0:a1] = j.T
+        both[a0:a1, b0:b1] = b
+        both[b0:b1, a0:a1] = b.T
+        marginal[a0:a1, b0:b1] = hits[:, a0:a1].T @ obs[:, b0:b1]
+        marginal[b0:b1, a0:a1] = hits[:, b0:b1].T @ obs[:, a0:a1]
+
+    _run_blocks(n_cols, block_size, n_jobs, run)
+    return joint, both, marginal
+
+
+# ----------------------------------------------------
+# Public matrices
+# ----------------------------------------------------
+def correlation_matrix(panel, min_periods=20, block_size=DEFAULT_BLOCK_SIZE, n_jobs=None):
+    """
+    Pairwise-complete Pearson correlation of all columns in float32.
+    """
+    values, labels = _as_float32(panel)
+    corr, _ = _masked_corr(values, np.isfinite(values), min_periods, block_size, n_jobs)
+    return pd.DataFrame(corr, index=labels, columns=labels)
+
+
+def _lower_tail(values, valid, quantile):
+    """
+    Boolean tail mask: at or below each column's `quantile`, or strictly
+    below it when the threshold value is tied (e.g. runs of zero changes),
+    so ties never inflate the tail.
+    """
+    thresholds = np.nanquantile(values, quantile, axis=0).astype(np.float32)
+
+    with np.errstate(invalid="ignore"):
+        at_threshold = values == thresholds
+        tied = at_threshold.sum(axis=0) > 1
+        tail = np.where(tied, values < thresholds, values <= thresholds)
+
+    return valid & tail
+
+
+def exceedance_correlation(panel, quantile=0.1, min_periods=10,
+                           block_size=DEFAULT_BLOCK_SIZE, n_jobs=None):
+    """
+    Lower-tail exceedance correlation: correlation of (i, j) over the
+    rows where both returns are in their own lower `quantile` tail.
+    """
+    values, labels = _as_float32(panel)
+    tail = _lower_tail(values, np.isfinite(values), quantile)
+
+    corr, _ = _masked_corr(values, tail, min_periods, block_size, n_jobs)
+    return pd.DataFrame(corr, index=labels, columns=labels)
+
+
+def tail_dependence(panel, quantile=0.05, min_periods=20, min_tail=5,
+                    block_size=DEFAULT_BLOCK_SIZE, n_jobs=None):
+    """
+    Empirical lower-tail dependence in [0, 1]: joint tail rows divided by
+    the smaller of the two realized tail counts, all over jointly valid
+    rows (1 = every tail day of the rarer series is shared). Pairs with
+    fewer than `min_tail` tail rows on either side are NaN.
+    """
+    values, labels = _as_float32(panel)
+    valid = np.isfinite(values)
+    tail = _lower_tail(values, valid, quantile)
+
+    joint, both, marginal = _indicator_overlap(tail, valid, block_size, n_jobs)
+    tail_count = np.minimum(marginal, marginal.T)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lam = joint / tail_count
+    lam[(both < min_periods) | (tail_count < min_tail)] = np.nan
+
+    return pd.DataFrame(lam, index=labels, columns=labels)
+
+
+def drawdown_indicator(panel, threshold=0.1):
+    """
+    Boolean panel: True where cumulative wealth sits more than
+    `threshold` below its running peak. NaN returns stay invalid.
+    """
+    values, labels = _as_float32(panel)
+    valid = np.isfinite(values)
+
+    wealth = np.cumprod(1.0 + np.where(valid, values, 0.0), axis=0)
+    peak = np.maximum.accumulate(wealth, axis=0)
+    in_drawdown = (wealth / peak - 1.0) <= -threshold
+
+    return in_drawdown & valid, valid, labels
+
+
+def co_drawdown_frequency(panel, threshold=0.1, min_periods=20,
+                          block_size=DEFAULT_BLOCK_SIZE, n_jobs=None):
+    """
+    Share of jointly observed dates on which both series are in a
+    drawdown deeper than `threshold`. Meant for return series only
+    (wealth is compounded from the values).
+    """
+    indicator, valid, labels = drawdown_indicator(panel, threshold)
+    joint, both, _ = _indicator_overlap(indicator, valid, block_size, n_jobs)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        freq = joint / both
+    freq[both < min_periods] = np.nan
+
+    return pd.DataFrame(freq, index=labels, columns=labels)
+
+
+# ----------------------------------------------------
+# Ordering & summaries
+# ----------------------------------------------------
+def cluster_order(matrix):
+    """
+    Hierarchical (average-linkage) leaf order using 1 - value as distance.
+    """
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    values = np.nan_to_num(matrix.to_numpy(dtype=np.float64), nan=0.0)
+    if len(values) < 3:
+        return list(matrix.index)
+
+    dist = 1.0 - (values + values.T) / 2.0
+    np.fill_diagonal(dist, 0.0)
+    dist = np.clip(dist, 0.0, None)
+
+    order = leaves_list(linkage(squareform(dist, checks=False), method="average"))
+    return [matrix.index[i] for i in order]
+
+
+def top_k_pairs(matrix, k=50, largest=True):
+    """
+    Return the k strongest off-diagonal pairs as a tidy DataFrame
+    (asset_a, asset_b, value), without sorting the full matrix.
+    """
+    values = matrix.to_numpy(dtype=np.float32)
+    rows, cols = np.triu_indices(len(values), k=1)
+    flat = values[rows, cols]
+
+    keep = np.isfinite(flat)
+    rows, cols, flat = rows[keep], cols[keep], flat[keep]
+    if flat.size == 0:
+        return pd.DataFrame(columns=["asset_a", "asset_b", "value"])
+
+    k = min(k, flat.size)
+    score = flat if largest else -flat
+    idx = np.argpartition(-score, k - 1)[:k]
+    idx = idx[np.argsort(-score[idx])]
+
+    labels = np.asarray(matrix.index)
+    return pd.DataFrame({
+        "asset_a": labels[rows[idx]],
+        "asset_b": labels[cols[idx]],
+        "value": flat[idx],
+    })
@@ -0,0 +1,120 @@
+"""
+fake_fred.py
+Local stand-in for the FRED observations endpoint
+(/fred/series/observations), serving in-memory series so FREDClient
+and get_data.py can run with no network.
+
+Point the client at it with FRED_API_URL (see FakeFREDServer.url).
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+
+OBSERVATIONS_PATH = "/fred/series/observations"
+
+
+def _observations(series, start=None, end=None):
+    """
+    FRED-style observation records; missing values are "." as in FRED.
+    """
+    s = series.sort_index()
+    if start:
+        s = s[s.index >= pd.Timestamp(start)]
+    if end:
+        s = s[s.index <= pd.Timestamp(end)]
+
+    dates = s.index.strftime("%Y-%m-%d")
+    values = ["." if pd.isna(v) else repr(float(v)) for v in s.to_numpy()]
+    today = pd.Timestamp.today().strftime("%Y-%m-%d")
+
+    return [
+        {"realtime_start": today, "realtime_end": today, "date": d, "value": v}
+        for d, v in zip(dates, values)
+    ]
+
+
+def _make_handler(series_store):
+    class FREDHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+            if parsed.path != OBSERVATIONS_PATH:
+                self._send(404, {"error_code": 404, "error_message": "Not Found"})
+                return
+
+            series_id = params.get("series_id", "")
+            if series_id not in series_store:
+                self._send(400, {
+                    "error_code": 400,
+                    "error_message": "Bad Request.  The series does not exist.",
+                })
+                return
+
+            start = params.get("observation_start")
+            end = params.get("observation_end")
+            obs = _observations(series_store[series_id], start, end)
+
+            self._send(200, {
+                "observation_start": start or "1776-07-04",
+                "observation_end": end or "9999-12-31",
+                "units": "lin",
+                "count": len(obs),
+                "offset": 0,
+                "limit": 100000,
+                "observations": obs,
+            })
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep load-test output quiet
+            pass
+
+    return FREDHandler
+
+
+class FakeFREDServer:
+    """
+    Threaded HTTP server for {series_id: pd.Series}. Use as a context
+    manager or call start() / stop(). port=0 picks a free port.
+    """
+
+    def __init__(self, series, host="127.0.0.1", port=0):
+        self.series = series
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(series))
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{OBSERVATIONS_PATH}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        print(f"[FakeFRED] Serving {len(self.series)} series at {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -12,14 +12,27 @@ import os
 load_dotenv()  # to read FRED_API_KEY from .env
 
 
+# Series collected by get_data.py
+FRED_SERIES = ["GDP", "CPIAUCSL", "UNRATE", "DGS3MO", "DGS10", "RSAFS", "HOUST"]
+
+# Series quoted in percent (changes are differences, not percent changes)
+RATE_SERIES = {"UNRATE", "DGS3MO", "DGS10"}
+
+# Series whose stress side is a rise (lower-tail metrics negate them)
+STRESS_UP_SERIES = {"UNRATE"}
+
+
 class FREDClient:
     """
     Minimal FRED API client.
     """
 
-    def __init__(self):
+    def __init__(self, url=None):
         self.api_key = os.getenv("FRED_API_KEY", "")
-        self.url = "https://api.stlouisfed.org/fred/series/observations"
+        # FRED_API_URL lets tests point at a local fake server
+        self.url = url or os.getenv(
+            "FRED_API_URL", "https://api.stlouisfed.org/fred/series/observations"
+        )
 
         if not self.api_key:
             print("[Warning] No FRED_API_KEY found in .env. Requests may be rate-limited.")
@@ -0,0 +1,325 @@
+"""
+scheduler.py
+Multi-universe, multi-period scheduler for the data collection stage.
+
+A job spec (JSON) names universes, windows and jobs:
+
+    {
+      "universes": {
+        "mega_cap": {"symbols": ["AAPL", "MSFT"]},
+        "sp500": {"file": "universes/sp500.txt"}
+      },
+      "windows": {
+        "2025Q1": {"start": "2025-01-01", "end": "2025-03-31"},
+        "2025Q2": {"start": "2025-04-01", "end": "2025-06-30"}
+      },
+      "jobs": [
+        {"name": "mega_cap_2025", "universe": "mega_cap",
+         "windows": ["2025Q1", "2025Q2"], "fred_series": ["UNRATE"]}
+      ]
+    }
+
+Universe files hold one symbol per line, or a CSV with a "symbol"
+column. Relative paths are resolved against the spec file.
+
+Jobs expand into (symbol, window) fetch tasks. Identical tasks are
+shared across jobs, and all windows of a symbol are served from one
+price-history download plus one fundamentals/info lookup.
+"""
+
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+
+from utils.fred_api import FREDClient
+from utils.yahoo_api import fetch_equity_profile, window_metrics
+
+
+# ----------------------------------------------------
+# 1. Job spec
+# ----------------------------------------------------
+def _read_universe(universe, base_dir):
+    """
+    Return the symbol list of one universe entry.
+    """
+    if "symbols" in universe:
+        symbols = universe["symbols"]
+    elif "file" in universe:
+        path = Path(universe["file"])
+        if not path.is_absolute():
+            path = base_dir / path
+
+        if path.suffix == ".csv":
+            symbols = pd.read_csv(path)["symbol"].tolist()
+        else:
+            lines = path.read_text(encoding="utf-8").splitlines()
+            symbols = [line for line in lines if line and not line.startswith("#")]
+    else:
+        raise ValueError(f"Universe needs 'symbols' or 'file': {universe}")
+
+    # Normalize and dedupe while keeping file order
+    cleaned = [str(s).strip().upper() for s in symbols if str(s).strip()]
+    return list(dict.fromkeys(cleaned))
+
+
+def load_job_spec(spec_path):
+    """
+    Load a job spec and resolve universes to symbol lists.
+    Output: list of jobs, each {"name", "symbols", "windows", "fred_series"}
+    with windows as {window_name: (start, end)}.
+    """
+    spec_path = Path(spec_path)
+    with open(spec_path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+
+    base_dir = spec_path.parent
+    universes = {
+        name: _read_universe(u, base_dir)
+        for name, u in spec.get("universes", {}).items()
+    }
+    windows = {
+        name: (w["start"], w["end"])
+        for name, w in spec.get("windows", {}).items()
+    }
+
+    jobs = []
+    for job in spec["jobs"]:
+        if job["universe"] not in universes:
+            raise ValueError(f"Job {job['name']}: unknown universe {job['universe']}")
+
+        missing = [w for w in job["windows"] if w not in windows]
+        if missing:
+            raise ValueError(f"Job {job['name']}: unknown windows {missing}")
+
+        jobs.append({
+            "name": job["name"],
+            "symbols": universes[job["universe"]],
+            "windows": {w: windows[w] for w in job["windows"]},
+            "fred_series": job.get("fred_series", []),
+        })
+
+    return jobs
+
+
+# ----------------------------------------------------
+# 2. Task expansion & planning
+# ----------------------------------------------------
+def expand_tasks(jobs):
+    """
+    Expand jobs into unique fetch tasks.
+    Output: dict {(symbol, start, end): set of (job_name, window_name)}
+    """
+    tasks = {}
+    for job in jobs:
+        for window_name, (start, end) in job["windows"].items():
+            for sym in job["symbols"]:
+                key = (sym, start, end)
+                tasks.setdefault(key, set()).add((job["name"], window_name))
+    return tasks
+
+
+def plan_batches(tasks):
+    """
+    Group tasks by symbol so each symbol is downloaded once, covering
+    the union of its windows. Symbols needed by more jobs run first.
+    Output: list of (symbol, [(start, end), ...]) sorted windows.
+    """
+    by_symbol = {}
+    demand = {}
+    for (sym, start, end), owners in tasks.items():
+        by_symbol.setdefault(sym, []).append((start, end))
+        demand[sym] = demand.get(sym, 0) + len(owners)
+
+    order = sorted(by_symbol, key=lambda s: (-demand[s], s))
+    return [(sym, sorted(by_symbol[sym])) for sym in order]
+
+
+# ----------------------------------------------------
+# 3. Workers
+# ----------------------------------------------------
+def fetch_symbol_windows(sym, windows):
+    """
+    Fetch one symbol for all its windows: a single price-history call
+    over the union span, one fundamentals/info lookup, then local
+    slicing per window.
+    Output: {(start, end): row dict or None}
+    """
+    ticker = yf.Ticker(sym)
+
+    span_start = min(start for start, _ in windows)
+    span_end = max(end for _, end in windows)
+
+    try:
+        history = ticker.history(start=span_start, end=span_end)
+    except Exception as e:
+        print(f"[Warning] Price download failed for {sym}: {e}")
+        return {w: None for w in windows}
+
+    if history.empty:
+        return {w: None for w in windows}
+
+    history = history.copy()
+    history.index = history.index.strftime("%Y-%m-%d")
+
+    meta, fin = fetch_equity_profile(sym, ticker)
+
+    rows = {}
+    for start, end in windows:
+        # Same [start, end) span a per-window history() call would return
+        price_df = history[(history.index >= start) & (history.index < end)]
+        if price_df.empty:
+            rows[(start, end)] = None
+            continue
+
+        window_return, window_mdd = window_metrics(price_df)
+        row = {
+            **meta,
+
+            # Prices (column names kept for clean_data compatibility)
+            "price_end": end,
+            "q2_return": window_return,
+            "q2_max_drawdown": window_mdd,
+        }
+        row.update(fin)
+        rows[(start, end)] = row
+
+    return rows
+
+
+# ----------------------------------------------------
+# 4. Scheduler
+# ----------------------------------------------------
+def run_jobs(jobs, out_dir, max_workers=8, use_processes=False, progress_every=25):
+    """
+    Run all jobs: dedupe tasks, fetch symbols on a thread (default) or
+    process pool, then write one equity_raw-style CSV per (job, window).
+
+    Outputs under out_dir:
+        <job>/<window>_equity_raw.csv
+        <job>/macro_raw.csv        (if the job lists fred_series)
+        job_stats.csv              (per-job throughput)
+    Output: job stats DataFrame.
+    """
+    if not jobs:
+        print("[Scheduler] No jobs to run")
+        return pd.DataFrame()
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tasks = expand_tasks(jobs)
+    batches = plan_batches(tasks)
+
+    requested = sum(len(j["symbols"]) * len(j["windows"]) for j in jobs)
+    print(f"[Scheduler] {len(jobs)} jobs → {requested} requested tasks, "
+          f"{len(tasks)} unique, {len(batches)} symbol downloads")
+
+    stats = {
+        job["name"]: {
+            "job": job["name"],
+            "tasks": len(job["symbols"]) * len(job["windows"]),
+            "done": 0, "failed": 0, "shared": 0, "finished_at": None,
+        }
+        for job in jobs
+    }
+    for owners in tasks.values():
+        if len(owners) > 1:
+            for job_name, _ in owners:
+                stats[job_name]["shared"] += 1
+
+    results = {}
+    started = time.perf_counter()
+    done_tasks = 0
+
+    executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_cls(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(fetch_symbol_windows, sym, windows): (sym, windows)
+            for sym, windows in batches
+        }
+
+        for i, future in enumerate(as_completed(futures), start=1):
+            sym, windows = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"[Warning] {sym} failed: {e}")
+                rows = {w: None for w in windows}
+
+            now = time.perf_counter() - started
+            for (start, end), row in rows.items():
+                key = (sym, start, end)
+                results[key] = row
+                done_tasks += 1
+                for job_name, _ in tasks[key]:
+                    job_stats = stats[job_name]
+                    job_stats["done"] += 1
+                    job_stats["failed"] += row is None
+                    job_stats["finished_at"] = now
+
+            if i % progress_every == 0 or i == len(futures):
+                rate = done_tasks / now if now > 0 else 0.0
+                print(f"[Scheduler] {i}/{len(futures)} symbols, "
+                      f"{done_tasks}/{len(tasks)} tasks "
+                      f"({100 * done_tasks / len(tasks):.0f}%), {rate:.1f} tasks/s")
+
+    # ---------- Outputs per (job, window) ----------
+    for job in jobs:
+        job_dir = out_dir / job["name"]
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        for window_name, (start, end) in job["windows"].items():
+            rows = [results.get((sym, start, end)) for sym in job["symbols"]]
+            panel_df = pd.DataFrame([r for r in rows if r is not None])
+            panel_df.to_csv(job_dir / f"{window_name}_equity_raw.csv", index=False)
+
+    download_job_macro(jobs, out_dir)
+
+    stats_df = pd.DataFrame(stats.values())
+    stats_df["elapsed_s"] = stats_df["finished_at"].fillna(0.0)
+    stats_df["tasks_per_s"] = stats_df["done"] / stats_df["elapsed_s"].where(
+        stats_df["elapsed_s"] > 0
+    )
+    stats_df = stats_df.drop(columns="finished_at")
+
+    stats_path = out_dir / "job_stats.csv"
+    stats_df.to_csv(stats_path, index=False)
+    print(stats_df.to_string(index=False))
+    print(f"[Saved] Job stats → {stats_path}")
+
+    return stats_df
+
+
+def download_job_macro(jobs, out_dir):
+    """
+    Fetch the union of FRED series across jobs once (over the union of
+    their windows) and write each job's subset to <job>/macro_raw.csv.
+    """
+    series = sorted({s for job in jobs for s in job["fred_series"]})
+    if not series:
+        return
+
+    spans = [w for job in jobs if job["fred_series"] for w in job["windows"].values()]
+    start = min(s for s, _ in spans)
+    end = max(e for _, e in spans)
+
+    macro_df = FREDClient().fetch_series(series_ids=series, start_date=start, end_date=end)
+    if macro_df.empty:
+        return
+
+    dates = pd.to_datetime(macro_df["date"])
+    for job in jobs:
+        if not job["fred_series"]:
+            continue
+        job_start = min(s for s, _ in job["windows"].values())
+        job_end = max(e for _, e in job["windows"].values())
+        in_span = (dates >= job_start) & (dates <= job_end)
+
+        cols = ["date"] + [s for s in job["fred_series"] if s in macro_df.columns]
+        macro_df.loc[in_span, cols].to_csv(
+            Path(out_dir) / job["name"] / "macro_raw.csv", index=False
+        )
@@ -0,0 +1,319 @@
+"""
+synthetic.py
+Synthetic market + macro data for offline load testing.
+
+Produces the same raw schemas as get_data.py:
+- macro_raw.csv  (FRED series, outer-merged on date)
+- equity_raw.csv (one row per stock, Q2-style window metrics + fundamentals)
+- prices_raw.csv (daily closes, date × symbol)
+- splits_raw.csv (reported split factors for the injected splits)
+
+Prices follow a one-factor model (market + sector + idiosyncratic) with
+configurable crash episodes, missing cells, late listings and optional
+bad-data injection (zero prices, unadjusted splits) for the validation
+stage.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+SECTORS = [
+    "Technology", "Healthcare", "Financial Services", "Energy",
+    "Consumer Cyclical", "Industrials", "Utilities", "Real Estate",
+]
+
+# ----------------------------------------------------
+# 1. Calendar & crash episodes
+# ----------------------------------------------------
+def make_calendar(years, end="2025-12-31"):
+    """
+    Business-day calendar covering `years` years up to `end`.
+    """
+    end = pd.Timestamp(end)
+    start = end - pd.DateOffset(years=years) + pd.Timedelta(days=1)
+    return pd.bdate_range(start, end)
+
+
+def make_crashes(dates, n_crashes, rng, min_days=15, max_days=60):
+    """
+    Random crash episodes as (start_idx, length, total_drop) tuples.
+    """
+    crashes = []
+    for _ in range(n_crashes):
+        length = int(rng.integers(min_days, max_days + 1))
+        start = int(rng.integers(0, max(len(dates) - length, 1)))
+        drop = float(rng.uniform(0.25, 0.5))
+        crashes.append((start, length, drop))
+    return crashes
+
+
+def _crash_profile(n_days, crashes):
+    """
+    Per-day (market drift, volatility multiplier, crash flag).
+    """
+    drift = np.full(n_days, 0.0003, dtype=np.float32)
+    vol_mult = np.ones(n_days, dtype=np.float32)
+    in_crash = np.zeros(n_days, dtype=bool)
+
+    for start, length, drop in crashes:
+        sl = slice(start, start + length)
+        drift[sl] = np.log(1.0 - drop) / length
+        vol_mult[sl] = 3.0
+        in_crash[sl] = True
+
+    return drift, vol_mult, in_crash
+
+
+# ----------------------------------------------------
+# 2. Daily prices
+# ----------------------------------------------------
+def make_prices(dates, n_tickers, crashes, rng, missing_rate=0.01,
+                late_listing_rate=0.1, bad_data_rate=0.0):
+    """
+    Daily closes (date × symbol) in float32, sector per symbol and the
+    injected splits (date × symbol factors, as in fetch_price_history).
+
+    - missing_rate: share of cells set to NaN
+    - late_listing_rate: share of tickers that list partway through
+    - bad_data_rate: share of tickers with one zero price and one
+      unadjusted 2:1 split (exercises clean_data validation)
+    """
+    n_days = len(dates)
+    symbols = [f"SYN{i:05d}" for i in range(n_tickers)]
+    sectors = rng.integers(0, len(SECTORS), n_tickers)
+
+    drift, vol_mult, _ = _crash_profile(n_days, crashes)
+
+    market = drift + rng.normal(0, 0.01, n_days).astype(np.float32) * vol_mult
+    sector_ret = rng.normal(0, 0.006, (n_days, len(SECTORS))).astype(np.float32)
+    sector_ret *= vol_mult[:, None]
+
+    beta = rng.uniform(0.6, 1.6, n_tickers).astype(np.float32)
+    idio_vol = rng.uniform(0.008, 0.03, n_tickers).astype(np.float32)
+
+    log_ret = rng.standard_normal((n_days, n_tickers), dtype=np.float32)
+    log_ret *= idio_vol
+    log_ret += market[:, None] * beta
+    log_ret += sector_ret[:, sectors]
+
+    start_price = rng.uniform(5, 500, n_tickers).astype(np.float32)
+    prices = np.exp(np.cumsum(log_ret, axis=0, dtype=np.float32)) * start_price
+    del log_ret
+
+    # Late listings: NaN before the IPO date
+    late = np.flatnonzero(rng.random(n_tickers) < late_listing_rate)
+    ipo = rng.integers(0, n_days, late.size)
+    before_ipo = np.arange(n_days)[:, None] < ipo
+    prices[:, late] = np.where(before_ipo, np.nan, prices[:, late])
+
+    # Random missing cells
+    if missing_rate > 0:
+        n_missing = int(prices.size * missing_rate)
+        flat = rng.integers(0, prices.size, n_missing)
+        prices.reshape(-1)[flat] = np.nan
+
+    # Bad data for the validation stage
+    bad = np.flatnonzero(rng.random(n_tickers) < bad_data_rate)
+    split_days = []
+    for col in bad:
+        zero_day, split_day = rng.integers(1, n_days, 2)
+        prices[zero_day, col] = 0.0
+        prices[split_day:, col] /= 2.0
+        split_days.append(split_day)
+
+    index = pd.Index(dates.strftime("%Y-%m-%d"), name="date")
+    prices_df = pd.DataFrame(prices, index=index, columns=symbols)
+
+    splits = np.zeros((n_days, n_tickers), dtype=np.float32)
+    splits[split_days, bad] = 2.0
+    splits_df = pd.DataFrame(splits, index=index, columns=symbols)
+    splits_df = splits_df[(splits_df > 0).any(axis=1)]
+
+    sector_names = pd.Series([SECTORS[s] for s in sectors], index=symbols)
+    return prices_df, sector_names, splits_df
+
+
+# ----------------------------------------------------
+# 3. Equity panel (equity_raw.csv schema)
+# ----------------------------------------------------
+def make_equity_panel(prices_df, sectors, rng, missing_rate=0.01):
+    """
+    One row per symbol in the build_equity_panel schema. Window
+    metrics use the last full quarter of the price panel.
+    """
+    dates = pd.to_datetime(prices_df.index)
+    quarters = dates.to_period("Q")
+    # Last quarter fully covered by the calendar
+    next_day = dates[-1] + pd.offsets.BDay(1)
+    last_q = quarters[-1] if next_day.to_period("Q") != quarters[-1] else quarters[-1] - 1
+    window = prices_df.to_numpy()[quarters == last_q]
+
+    # Same definitions as yahoo_api.window_metrics (first / last available
+    # close, drawdown over available closes), vectorized over columns
+    observed = np.isfinite(window)
+    cols = np.arange(window.shape[1])
+    first = window[observed.argmax(axis=0), cols]
+    last = window[len(window) - 1 - observed[::-1].argmax(axis=0), cols]
+
+    peak = np.fmax.accumulate(window, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mdd = np.nanmin(window / peak - 1.0, axis=0)
+        q_return = (last - first) / first
+    mdd[observed.sum(axis=0) < 2] = np.nan
+
+    n = prices_df.shape[1]
+    symbols = prices_df.columns
+
+    total_assets = np.exp(rng.normal(22, 1.5, n))
+    debt_to_assets = rng.beta(4, 4, n)
+    total_liabilities = total_assets * debt_to_assets
+    total_equity = total_assets - total_liabilities
+    total_revenue = total_assets * rng.uniform(0.2, 1.5, n)
+    net_income = total_revenue * rng.normal(0.08, 0.1, n)
+
+    # Latest reported quarter: the one before the window, or (stale info)
+    # two years older for a `missing_rate` share of symbols
+    stale = rng.random(n) < missing_rate
+    reported = pd.DatetimeIndex(np.where(
+        stale, (last_q - 9).end_time.normalize(), (last_q - 1).end_time.normalize()
+    ))
+
+    df = pd.DataFrame({
+        "symbol": symbols,
+        "company_name": [f"Synthetic Corp {s[3:]}" for s in symbols],
+        "sector": sectors.reindex(symbols).to_numpy(),
+        "industry": "",
+        "market_cap": total_equity * rng.uniform(0.5, 5, n),
+        "country": "United States",
+        "exchange": "NMS",
+        "most_recent_quarter": reported.strftime("%Y-%m-%d"),
+
+        # Prices
+        "price_end": last_q.end_time.strftime("%Y-%m-%d"),
+        "q2_return": q_return,
+        "q2_max_drawdown": mdd,
+
+        "total_assets": total_assets,
+        "total_liabilities": total_liabilities,
+        "total_equity": total_equity,
+        "net_income": net_income,
+        "total_revenue": total_revenue,
+    })
+
+    # Missing fundamentals, as Yahoo often returns
+    fundamentals = ["total_assets", "total_liabilities", "total_equity",
+                    "net_income", "total_revenue"]
+    holes = rng.random((n, len(fundamentals))) < missing_rate
+    df[fundamentals] = df[fundamentals].mask(holes)
+
+    df["roa"] = df["net_income"] / df["total_assets"]
+    df["net_profit_margin"] = df["net_income"] / df["total_revenue"]
+    df["debt_to_assets"] = df["total_liabilities"] / df["total_assets"]
+    return df
+
+
+# ----------------------------------------------------
+# 4. Macro series (FRED)
+# ----------------------------------------------------
+def make_macro_series(dates, crashes, rng, missing_rate=0.0):
+    """
+    Synthetic FRED series keyed by series id, at FRED frequencies:
+    GDP quarterly, DGS3MO / DGS10 daily, the rest monthly.
+    UNRATE rises and short rates are cut after crash episodes; the
+    yield curve inverts in the months leading into them.
+    Output: {series_id: pd.Series indexed by date}
+    """
+    n_days = len(dates)
+    _, _, in_crash = _crash_profile(n_days, crashes)
+    stress = pd.Series(in_crash.astype(float), index=dates)
+    stress = stress.rolling(120, min_periods=1).mean()
+
+    def walk(n, step, start):
+        return start + np.cumsum(rng.normal(0, step, n))
+
+    # Share of the next ~6 months spent in a crash (drives inversion)
+    lead = stress.shift(-120).fillna(0.0).to_numpy()
+
+    daily_3m = np.clip(walk(n_days, 0.03, 3.0) - 3.0 * stress.to_numpy(), 0.0, None)
+    spread = np.clip(1.2 + walk(n_days, 0.01, 0.0), -0.5, 3.5) - 5.0 * lead
+    daily_10m = np.clip(daily_3m + spread, 0.0, None)
+
+    month_starts = stress.resample("MS").first().index
+    month_stress = stress.resample("MS").mean().to_numpy()
+    n_months = len(month_starts)
+
+    quarter_starts = stress.resample("QS").first().index
+    n_quarters = len(quarter_starts)
+
+    series = {
+        "GDP": pd.Series(10000 * np.exp(np.cumsum(rng.normal(0.012, 0.008, n_quarters))),
+                         index=quarter_starts),
+        "CPIAUCSL": pd.Series(170 * np.exp(np.cumsum(rng.normal(0.002, 0.002, n_months))),
+                              index=month_starts),
+        "UNRATE": pd.Series(np.clip(walk(n_months, 0.1, 5.0) + 4.0 * month_stress, 2.5, 20),
+                            index=month_starts),
+        "DGS3MO": pd.Series(daily_3m, index=dates),
+        "DGS10": pd.Series(daily_10m, index=dates),
+        "RSAFS": pd.Series(300000 * np.exp(np.cumsum(rng.normal(0.003, 0.01, n_months))),
+                           index=month_starts),
+        "HOUST": pd.Series(np.clip(walk(n_months, 30, 1500) - 500 * month_stress, 400, None),
+                           index=month_starts),
+    }
+
+    for name, s in series.items():
+        holes = rng.random(len(s)) < missing_rate
+        series[name] = s.round(3).mask(holes)
+
+    return series
+
+
+def macro_frame(series):
+    """
+    Combine series the way FREDClient.fetch_series does (outer merge on date).
+    """
+    out = pd.concat(
+        {name: s.rename_axis("date") for name, s in series.items()}, axis=1
+    )
+    return out.sort_index().reset_index()
+
+
+# ----------------------------------------------------
+# 5. Writer
+# ----------------------------------------------------
+def generate_raw_data(raw_dir, n_tickers=500, years=25, missing_rate=0.01,
+                      n_crashes=3, late_listing_rate=0.1, bad_data_rate=0.0,
+                      seed=0):
+    """
+    Write macro_raw.csv, equity_raw.csv, prices_raw.csv and
+    splits_raw.csv into raw_dir.
+    Output: FRED series dict (for the fake FRED server).
+    """
+    rng = np.random.default_rng(seed)
+
+    dates = make_calendar(years)
+    crashes = make_crashes(dates, n_crashes, rng)
+
+    series = make_macro_series(dates, crashes, rng, missing_rate)
+    macro_df = macro_frame(series)
+    macro_df.to_csv(raw_dir / "macro_raw.csv")
+    print(f"[Saved] Synthetic macro data → {raw_dir / 'macro_raw.csv'}")
+
+    prices_df, sectors, splits_df = make_prices(
+        dates, n_tickers, crashes, rng,
+        missing_rate=missing_rate,
+        late_listing_rate=late_listing_rate,
+        bad_data_rate=bad_data_rate,
+    )
+
+    panel_df = make_equity_panel(prices_df, sectors, rng, missing_rate)
+    panel_df.to_csv(raw_dir / "equity_raw.csv", index=False)
+    print(f"[Saved] Synthetic equity panel → {raw_dir / 'equity_raw.csv'}")
+
+    prices_df.to_csv(raw_dir / "prices_raw.csv", float_format="%.4f")
+    print(f"[Saved] Synthetic daily prices → {raw_dir / 'prices_raw.csv'}")
+
+    splits_df.to_csv(raw_dir / "splits_raw.csv")
+    print(f"[Saved] Synthetic stock splits → {raw_dir / 'splits_raw.csv'}")
+
+    return series
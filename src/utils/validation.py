@@ -0,0 +1,327 @@
+"""
+validation.py
+Declarative data-quality rules, checked in vectorized form:
+- row rules for the equity panel (required, range, identity, max_age)
+- panel rules for date × symbol frames (monotonic dates, range,
+  jumps / split artifacts)
+Failing rows / cells are returned as a quarantine table with reasons
+and the action taken ("quarantine" = removed, "flag" = kept).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ----------------------------------------------------
+# Rule sets
+# ----------------------------------------------------
+# Row rules (one row per stock). action="quarantine" removes the row,
+# action="flag" keeps it but still records the reason.
+EQUITY_RULES = [
+    {"name": "missing_drawdown", "type": "required", "columns": ["q2_max_drawdown"]},
+    {"name": "missing_fundamentals", "type": "required",
+     "columns": ["total_assets", "total_liabilities", "net_income", "total_revenue"]},
+    {"name": "missing_metadata", "type": "required",
+     "columns": ["company_name", "market_cap"], "action": "flag"},
+    # A drawdown of -100% / return of -100% only comes from a zero close;
+    # a zero first close gives an infinite return
+    {"name": "drawdown_out_of_range", "type": "range",
+     "column": "q2_max_drawdown", "min": -1.0, "min_exclusive": True, "max": 0.0},
+    {"name": "return_out_of_range", "type": "range",
+     "column": "q2_return", "min": -1.0, "min_exclusive": True, "max": 10.0},
+    {"name": "non_positive_assets", "type": "range",
+     "column": "total_assets", "min": 0.0, "min_exclusive": True},
+    {"name": "debt_to_assets_out_of_range", "type": "range",
+     "column": "debt_to_assets", "min": 0.0, "max": 5.0},
+    {"name": "balance_sheet_identity", "type": "identity",
+     "lhs": "total_assets", "rhs": ["total_liabilities", "total_equity"], "rtol": 0.1},
+    # info["mostRecentQuarter"] far behind the price window: stale info
+    {"name": "stale_info", "type": "max_age",
+     "column": "most_recent_quarter", "reference": "price_end", "max_days": 200},
+]
+
+# Daily closes (date × symbol). Out-of-order dates are flagged and
+# sorted into place; duplicated dates keep the first row in file order.
+PRICE_RULES = [
+    {"name": "non_monotonic_dates", "type": "monotonic_index"},
+    {"name": "non_positive_price", "type": "range", "min": 0.0, "min_exclusive": True},
+]
+
+# Daily simple returns (date × symbol). A split artifact is a large move
+# that matches a split Yahoo reports for that day; only those are set to
+# NaN. For symbols with no split data, a move that matches a split factor
+# relative to the day's median move is flagged but kept, since a real
+# single-stock crash looks the same.
+RETURN_RULES = [
+    {"name": "split_artifact", "type": "split_artifact",
+     "ratios": [1 / 10, 1 / 5, 1 / 4, 1 / 3, 1 / 2, 2 / 3, 3 / 2, 2, 3, 4, 5, 10],
+     "tol": 0.05, "event_tol": 0.1, "min_move": 0.25},
+    {"name": "return_jump", "type": "range", "min": -0.9, "max": 3.0},
+]
+
+# FRED series (date × series)
+MACRO_RULES = [
+    {"name": "non_monotonic_dates", "type": "monotonic_index"},
+    {"name": "unrate_out_of_range", "type": "range", "column": "UNRATE", "min": 0.0, "max": 40.0},
+    {"name": "rate_out_of_range", "type": "range",
+     "columns": ["DGS3MO", "DGS10"], "min": -5.0, "max": 30.0},
+    {"name": "non_positive_level", "type": "range",
+     "columns": ["GDP", "CPIAUCSL", "RSAFS", "HOUST"], "min": 0.0, "min_exclusive": True},
+]
+
+
+# ----------------------------------------------------
+# Vectorized checks
+# ----------------------------------------------------
+def _range_fail(values, rule):
+    """
+    Boolean mask of values outside [min, max]. NaN never fails a range
+    rule (missingness is the job of "required").
+    """
+    fail = np.zeros(values.shape, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        if "min" in rule:
+            if rule.get("min_exclusive"):
+                fail |= values <= rule["min"]
+            else:
+                fail |= values < rule["min"]
+        if "max" in rule:
+            fail |= values > rule["max"]
+    return fail
+
+
+def _numeric(df, cols):
+    return df[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+
+
+def check_rows(df, rules):
+    """
+    Evaluate row rules over the whole frame at once.
+    Output: boolean DataFrame (rows × rule names), True = rule failed.
+    Range / identity / max_age rules whose columns are absent are
+    skipped; a required rule with absent columns raises ValueError
+    (e.g. no fundamentals were downloaded for any symbol).
+    """
+    failures = {}
+
+    for rule in rules:
+        kind = rule["type"]
+
+        if kind == "required":
+            cols = rule["columns"]
+            missing = [c for c in cols if c not in df.columns]
+            if missing:
+                raise ValueError(
+                    f"Rule {rule['name']}: required columns missing from data: {missing}"
+                )
+            blank = df[cols].isna() | df[cols].astype(str).apply(
+                lambda s: s.str.strip().eq("")
+            )
+            fail = blank.any(axis=1).to_numpy()
+
+        elif kind == "range":
+            if rule["column"] not in df.columns:
+                continue
+            fail = _range_fail(_numeric(df, [rule["column"]])[:, 0], rule)
+
+        elif kind == "identity":
+            cols = [rule["lhs"]] + rule["rhs"]
+            if any(c not in df.columns for c in cols):
+                continue
+            values = _numeric(df, cols)
+            lhs, rhs = values[:, 0], values[:, 1:].sum(axis=1)
+            with np.errstate(invalid="ignore"):
+                fail = np.abs(lhs - rhs) > rule["rtol"] * np.abs(lhs)
+
+        elif kind == "max_age":
+            if rule["column"] not in df.columns or rule["reference"] not in df.columns:
+                continue
+            stamp = pd.to_datetime(df[rule["column"]], errors="coerce")
+            reference = pd.to_datetime(df[rule["reference"]], errors="coerce")
+            # Missing dates are not evaluated (NaN comparison is False)
+            fail = ((reference - stamp).dt.days > rule["max_days"]).to_numpy()
+
+        else:
+            raise ValueError(f"Unknown row rule type: {kind}")
+
+        failures[rule["name"]] = fail
+
+    return pd.DataFrame(failures, index=df.index, dtype=bool)
+
+
+def _join_reasons(failures):
+    """
+    "rule_a;rule_b" per row, built with one matrix product instead of
+    a Python loop over rows.
+    """
+    if failures.shape[1] == 0:
+        return pd.Series("", index=failures.index)
+    names = np.array([f"{c};" for c in failures.columns], dtype=object)
+    joined = failures.to_numpy().astype(object).dot(names)
+    return pd.Series(joined, index=failures.index, dtype=str).str.rstrip(";")
+
+
+def validate_rows(df, rules):
+    """
+    Apply row rules.
+    Output: (clean_df, quarantine_df). quarantine_df holds every row that
+    failed any rule plus "reasons" and "action" columns.
+    """
+    failures = check_rows(df, rules)
+    quarantine_names = [r["name"] for r in rules
+                        if r.get("action", "quarantine") == "quarantine"
+                        and r["name"] in failures.columns]
+
+    any_fail = failures.any(axis=1)
+    drop = failures[quarantine_names].any(axis=1)
+
+    quarantine = df[any_fail].copy()
+    quarantine["reasons"] = _join_reasons(failures[any_fail])
+    quarantine["action"] = np.where(drop[any_fail], "quarantine", "flag")
+
+    return df[~drop].copy(), quarantine
+
+
+def _split_artifacts(index, values, sub, sub_columns, rule, events=None):
+    """
+    Masks (fail, flag) of split jumps in a return panel. Only moves of at
+    least `min_move` are candidates, so the checks below stay small.
+
+    - fail: the move falls on a split date reported in `events` and
+      matches 1 / split factor (within `event_tol`).
+    - flag: for columns not covered by `events`, the move relative to the
+      day's cross-sectional median is itself a large move and matches a
+      split factor (within `tol`). Market-wide moves are never flagged.
+    """
+    with np.errstate(invalid="ignore"):
+        fail = np.abs(sub) >= rule["min_move"]
+    rows, cols = np.nonzero(fail)
+    fail[:] = False
+    flag = fail.copy()
+    if rows.size == 0:
+        return fail, flag
+
+    ratio = 1.0 + sub[rows, cols].astype(np.float64)
+    symbols = sub_columns[cols]
+
+    known = np.zeros(rows.size, dtype=bool)
+    factor = np.zeros(rows.size, dtype=np.float64)
+    if events is not None and not events.empty:
+        known = np.isin(symbols, np.asarray(events.columns))
+        reported = events.stack()
+        reported = reported[reported > 0]
+        lookup = dict(zip(reported.index, reported.to_numpy(dtype=np.float64)))
+        dates = index[rows]
+        factor = np.array([lookup.get((d, s), 0.0) for d, s in zip(dates, symbols)])
+
+    with np.errstate(invalid="ignore"):
+        on_event = (factor > 0) & (np.abs(ratio * factor - 1.0) <= rule["event_tol"])
+
+    # Median move of the whole cross-section on each candidate day
+    cand_rows, inverse = np.unique(rows, return_inverse=True)
+    market = np.nanmedian(values[cand_rows], axis=1)[inverse]
+    relative = ratio / (1.0 + np.nan_to_num(market))
+
+    ratios = np.asarray(rule["ratios"], dtype=np.float64)
+    closest = np.min(np.abs(relative[:, None] / ratios - 1.0), axis=1)
+    idiosyncratic = np.abs(relative - 1.0) >= rule["min_move"]
+    off_market = idiosyncratic & (closest <= rule["tol"])
+
+    fail[rows[on_event], cols[on_event]] = True
+    suspect = ~known & off_market
+    flag[rows[suspect], cols[suspect]] = True
+    return fail, flag
+
+
+def _panel_records(dates, columns, values, reason, action):
+    return pd.DataFrame({
+        "date": dates, "column": columns, "value": values,
+        "reason": reason, "action": action,
+    })
+
+
+def validate_panel(panel, rules, events=None):
+    """
+    Apply panel rules to a date-indexed wide frame (date × column).
+    Failing cells are set to NaN. Duplicated dates keep the first row in
+    file order (the others are removed); out-of-order dates are flagged
+    and sorted into place. `events` (date × column split factors, 0 = no
+    split) is used by split_artifact rules for the columns it covers.
+    Output: (clean_panel, quarantine_df[date, column, value, reason, action]).
+    """
+    records = []
+
+    for rule in rules:
+        if rule["type"] != "monotonic_index":
+            continue
+        dates = panel.index.to_numpy()
+        dup = panel.index.duplicated(keep="first")
+        if len(dates) and (not panel.index.is_monotonic_increasing or dup.any()):
+            # A date is out of order if it precedes some earlier row's date
+            running_max = np.maximum.accumulate(dates)
+            out_of_order = np.r_[False, dates[1:] < running_max[:-1]] & ~dup
+            if out_of_order.any():
+                records.append(_panel_records(
+                    panel.index[out_of_order], "*", np.nan, rule["name"], "flag"
+                ))
+            if dup.any():
+                records.append(_panel_records(
+                    panel.index[dup], "*", np.nan, rule["name"] + ":duplicate",
+                    "quarantine",
+                ))
+            panel = panel[~dup].sort_index(kind="stable")
+
+    columns = np.asarray(panel.columns)
+    values = panel.to_numpy()
+    if values.dtype.kind != "f":
+        values = values.astype(np.float64)
+    bad = np.zeros(values.shape, dtype=bool)
+
+    for rule in rules:
+        kind = rule["type"]
+        if kind == "monotonic_index":
+            continue
+
+        targets = rule.get("columns") or ([rule["column"]] if "column" in rule else None)
+        if targets is None:
+            col_idx = np.arange(len(columns))
+        else:
+            col_idx = np.flatnonzero(np.isin(columns, targets))
+        if col_idx.size == 0:
+            continue
+
+        sub = values[:, col_idx]
+        flag = None
+
+        if kind == "range":
+            fail = _range_fail(sub, rule)
+
+        elif kind == "split_artifact":
+            fail, flag = _split_artifacts(panel.index, values, sub, columns[col_idx],
+                                          rule, events)
+
+        else:
+            raise ValueError(f"Unknown panel rule type: {kind}")
+
+        for mask, action in ((fail, "quarantine"), (flag, "flag")):
+            if mask is None:
+                continue
+            rows, cols = np.nonzero(mask)
+            if rows.size == 0:
+                continue
+            records.append(_panel_records(
+                panel.index[rows], columns[col_idx[cols]], sub[rows, cols],
+                rule["name"], action,
+            ))
+            if action == "quarantine":
+                bad[rows, col_idx[cols]] = True
+
+    if bad.any():
+        panel = panel.mask(bad)
+
+    if records:
+        quarantine = pd.concat(records, ignore_index=True)
+    else:
+        quarantine = pd.DataFrame(columns=["date", "column", "value", "reason", "action"])
+
+    return panel, quarantine
@@ -22,15 +22,24 @@ def fetch_financials(ticker):
 
     result = {}
 
-    def safe_extract(df, row_name):
-        try:
-            return df.loc[row_name].iloc[0]
-        except:
-            return np.nan
+    def safe_extract(df, row_names):
+        # Row labels differ across yfinance versions; take the first present
+        if isinstance(row_names, str):
+            row_names = [row_names]
+        for row_name in row_names:
+            try:
+                return df.loc[row_name].iloc[0]
+            except:
+                continue
+        return np.nan
 
     result["total_assets"] = safe_extract(bs, "Total Assets")
-    result["total_liabilities"] = safe_extract(bs, "Total Liab")
-    result["total_equity"] = safe_extract(bs, "Total Stockholder Equity")
+    result["total_liabilities"] = safe_extract(
+        bs, ["Total Liab", "Total Liabilities Net Minority Interest"]
+    )
+    result["total_equity"] = safe_extract(
+        bs, ["Total Stockholder Equity", "Stockholders Equity"]
+    )
     result["net_income"] = safe_extract(fin, "Net Income")
     result["total_revenue"] = safe_extract(fin, "Total Revenue")
 
@@ -53,6 +62,51 @@ def fetch_financials(ticker):
     return result
 
 
+def window_metrics(price_df):
+    """
+    Window return + max drawdown from the rows inside the window.
+    The return runs from the first to the last available close, so
+    windows starting on a holiday or ending on a weekend still count.
+    """
+    close = price_df["Close"].dropna()
+    if close.empty:
+        return np.nan, np.nan
+
+    window_return = compute_return(close.iloc[0], close.iloc[-1])
+    window_mdd = compute_max_drawdown(close)
+    return window_return, window_mdd
+
+
+def fetch_equity_profile(sym, ticker):
+    """
+    Metadata + fundamentals for one symbol (the window-independent
+    parts of an equity panel row).
+    Output: (metadata dict, financials dict)
+    """
+    # ---------- Fundamentals ----------
+    fin = fetch_financials(ticker)
+
+    # ---------- Metadata ----------
+    info = ticker.info or {}
+
+    # Epoch seconds of the latest reported quarter (staleness check)
+    most_recent_quarter = info.get("mostRecentQuarter")
+    if most_recent_quarter:
+        most_recent_quarter = pd.to_datetime(most_recent_quarter, unit="s").strftime("%Y-%m-%d")
+
+    meta = {
+        "symbol": sym,
+        "company_name": info.get("longName", ""),
+        "sector": info.get("sector", ""),
+        "industry": info.get("industry", ""),
+        "market_cap": info.get("marketCap", None),
+        "country": info.get("country", ""),
+        "exchange": info.get("exchange", ""),
+        "most_recent_quarter": most_recent_quarter,
+    }
+    return meta, fin
+
+
 def build_equity_panel(symbols, price_start="2025-04-01", price_end="2025-06-30"):
     """
     Download financial and price data for multiple symbols.
@@ -77,33 +131,15 @@ def build_equity_panel(symbols, price_start="2025-04-01", price_end="2025-06-30"
         price_df = price_df.copy()
         price_df.index = price_df.index.strftime("%Y-%m-%d")
 
-        try:
-            start_price = price_df.loc[price_start, "Close"]
-            end_price = price_df.loc[price_end, "Close"]
-        except:
-            start_price = None
-            end_price = None
-
-        q2_return = compute_return(start_price, end_price)
-        q2_mdd = compute_max_drawdown(price_df["Close"])
-
-
-        # ---------- Fundamentals ----------
-        fin = fetch_financials(ticker)
+        q2_return, q2_mdd = window_metrics(price_df)
 
-        # ---------- Metadata ----------
-        info = ticker.info or {}
+        meta, fin = fetch_equity_profile(sym, ticker)
 
         row = {
-            "symbol": sym,
-            "company_name": info.get("longName", ""),
-            "sector": info.get("sector", ""),
-            "industry": info.get("industry", ""),
-            "market_cap": info.get("marketCap", None),
-            "country": info.get("country", ""),
-            "exchange": info.get("exchange", ""),
+            **meta,
 
             # Prices
+            "price_end": price_end,
             "q2_return": q2_return,
             "q2_max_drawdown": q2_mdd,
         }
@@ -112,3 +148,33 @@ def build_equity_panel(symbols, price_start="2025-04-01", price_end="2025-06-30"
         rows.append(row)
 
     return pd.DataFrame(rows)
+
+
+def fetch_price_history(symbols, start="1998-01-01", end="2025-12-31"):
+    """
+    Download daily closes and reported stock splits for multiple symbols.
+    Output: (closes, splits), both DataFrames (date × symbol) with dates
+    as YYYY-MM-DD strings; splits hold the split factor (0 = none) and
+    only keep dates on which some symbol split.
+    """
+    closes = {}
+    splits = {}
+
+    for sym in symbols:
+        print(f"[Yahoo] Fetching price history for {sym} ...")
+
+        price_df = yf.Ticker(sym).history(start=start, end=end)
+
+        if price_df.empty:
+            print(f"[Warning] No price history for {sym}")
+            continue
+
+        dates = price_df.index.strftime("%Y-%m-%d")
+        closes[sym] = pd.Series(price_df["Close"].to_numpy(), index=dates)
+        if "Stock Splits" in price_df.columns:
+            splits[sym] = pd.Series(price_df["Stock Splits"].to_numpy(), index=dates)
+
+    closes_df = pd.DataFrame(closes).sort_index()
+    splits_df = pd.DataFrame(splits).sort_index().fillna(0.0)
+    splits_df = splits_df[(splits_df > 0).any(axis=1)]
+    return closes_df, splits_df
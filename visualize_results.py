@@ -10,6 +10,10 @@ This script produces:
       - Net Profit Margin vs Drawdown
       - Debt-to-Assets vs Drawdown
 4. Correlation heatmap
+5. Cross-asset co-movement on the daily return panel:
+      - clustered heatmaps (correlation, exceedance correlation,
+        tail dependence, co-drawdown frequency)
+      - top-k pair lists (CSV)
 
 All output PNGs are stored in: results/
 """
@@ -19,6 +23,16 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 from utils.helpers import get_data_dir
+from utils.correlation import (
+    build_return_panel,
+    correlation_matrix,
+    exceedance_correlation,
+    tail_dependence,
+    co_drawdown_frequency,
+    stress_oriented,
+    cluster_order,
+    top_k_pairs,
+)
 
 
 # ----------------------------------------------------
@@ -112,6 +126,75 @@ def plot_correlation_heatmap(df, output_dir):
     plt.close(fig)
 
 
+# ----------------------------------------------------
+# 5. Cross-Asset Co-Movement (return panel)
+# ----------------------------------------------------
+def plot_clustered_heatmap(matrix, title, fname, output_dir, vmin=-1, vmax=1, max_labels=60):
+    """
+    Heatmap with rows/columns reordered by hierarchical clustering.
+    Uses imshow so thousands of assets still render quickly.
+    """
+    order = cluster_order(matrix)
+    ordered = matrix.loc[order, order]
+
+    size = min(6 + len(order) * 0.15, 20)
+    fig, ax = plt.subplots(figsize=(size, size))
+    im = ax.imshow(ordered.to_numpy(), cmap="coolwarm", vmin=vmin, vmax=vmax,
+                   interpolation="nearest")
+    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+
+    if len(order) <= max_labels:
+        ax.set_xticks(range(len(order)))
+        ax.set_xticklabels(order, rotation=90, fontsize=7)
+        ax.set_yticks(range(len(order)))
+        ax.set_yticklabels(order, fontsize=7)
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+
+    ax.set_title(title)
+    plt.tight_layout()
+    fig.savefig(output_dir / fname, dpi=150)
+    plt.close(fig)
+
+
+def comovement_analysis(returns_df, macro_df, output_dir, top_k=50):
+    """
+    Daily equity co-movement matrices, plus quarterly cross-asset
+    matrices (equity returns vs FRED series changes at the same
+    frequency). Saves clustered heatmaps and top-k pair lists.
+    """
+    daily = build_return_panel(returns_df)
+    quarterly = build_return_panel(returns_df, macro_df, freq="QE")
+
+    matrices = {
+        "correlation": (correlation_matrix(daily), -1, 1,
+                        "Daily Return Correlation (clustered)"),
+        "exceedance_corr": (exceedance_correlation(daily), -1, 1,
+                            "Lower-Tail Exceedance Correlation (clustered)"),
+        "tail_dependence": (tail_dependence(daily), 0, 1,
+                            "Lower-Tail Dependence (clustered)"),
+        "co_drawdown": (co_drawdown_frequency(daily), 0, 1,
+                        "Co-Drawdown Frequency (clustered)"),
+        "macro_correlation": (correlation_matrix(quarterly), -1, 1,
+                              "Quarterly Equity + FRED Correlation (clustered)"),
+        # Stress side of each FRED series (e.g. rising UNRATE) as its lower tail
+        "macro_tail_dependence": (tail_dependence(stress_oriented(quarterly), quantile=0.1,
+                                                  min_periods=40),
+                                  0, 1, "Quarterly Equity + FRED Tail Dependence (clustered)"),
+    }
+
+    for name, (matrix, vmin, vmax, title) in matrices.items():
+        print(f"[Plot] Clustered Heatmap: {name}")
+        plot_clustered_heatmap(matrix, title, f"{name}_clustered.png",
+                               output_dir, vmin=vmin, vmax=vmax)
+
+        pairs = top_k_pairs(matrix, k=top_k)
+        out_path = output_dir / f"{name}_top_pairs.csv"
+        pairs.to_csv(out_path, index=False)
+        print(f"[Saved] Top {len(pairs)} pairs → {out_path}")
+
+
 # ----------------------------------------------------
 # Main Visualization Pipeline
 # ----------------------------------------------------
@@ -158,6 +241,14 @@ def main():
     print("[Plot] Correlation Heatmap")
     plot_correlation_heatmap(equity_df, results_dir)
 
+    # 5. Cross-asset co-movement
+    returns_path = data_dir / "processed" / "returns_clean.csv"
+    if returns_path.exists():
+        returns_df = pd.read_csv(returns_path)
+        comovement_analysis(returns_df, macro_df, results_dir)
+    else:
+        print(f"[Skip] No return panel at {returns_path}")
+
     print("\n=== Visualization Complete ===\n")
 
 